@@ -14,6 +14,9 @@ from .comment import cli_add_comment
 from .link import cli_jira_link
 from .make_and_link import cli_make_linked
 from .do_search import cli_search
+from .records import DEFAULT_SEARCH_FIELDS
+from .export import WRITERS
+from .mirror import cli_sync, DEFAULT_MIRROR_FIELDS
 from .assignee import cli_reassign
 from .example_config import cli_example_config
 
@@ -128,6 +131,17 @@ def _setup_make_linked_parser(parser: ArgumentParser) -> ArgumentParser:
         default=list_from_config("WATCHERS"),
         help="Watchers to add to Test JIRA",
     )
+    parser.add_argument(
+        "--rollback",
+        action="store_true",
+        help="Delete the Test JIRA left by an unfinished run instead of resuming it",
+    )
+    parser.add_argument(
+        "--track",
+        action="store_true",
+        help="Label the Test JIRA while it is being made, so a rerun can find it "
+        "if the run stops mid-create; needs Labels on the project's create screen",
+    )
     return parser
 
 
@@ -148,6 +162,8 @@ def make_linked() -> None:
         jira_id=args.jira_id,
         issue_type=args.issue_type,
         watchers=args.watchers,
+        rollback=args.rollback,
+        track=args.track,
     )
 
 
@@ -188,6 +204,37 @@ def _setup_search_parser(parser):
         "--no-max-count", "-n", action="store_false", dest="max_results"
     )
     parser.add_argument("--count-only", "-c", action="store_true")
+    parser.add_argument(
+        "--fields",
+        "-f",
+        default=DEFAULT_SEARCH_FIELDS,
+        help="Comma-separated list of fields to fetch for each issue.",
+    )
+    parser.add_argument(
+        "--expand", help="Comma-separated list of extra data to expand, e.g. changelog."
+    )
+    parser.add_argument(
+        "--mirror",
+        action="store_true",
+        help="Answer from the local mirror when it holds a fresh sync of the query.",
+    )
+    parser.add_argument(
+        "--format",
+        dest="output_format",
+        choices=sorted(WRITERS),
+        default="text",
+        help="Output format; jsonl, csv and columns include the --fields values.",
+    )
+    parser.add_argument(
+        "--output", "-o", default="-", help="File to write results to, - for stdout."
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=0,
+        help="Fetch results concurrently, split into this many created-date ranges "
+        "(results are then ordered by creation date).",
+    )
     parser.add_argument("query")
     return parser
 
@@ -199,8 +246,47 @@ def search() -> None:
     )
     args = parser.parse_args()
     cli_search(
-        query=args.query, max_results=args.max_results, count_only=args.count_only
+        query=args.query,
+        max_results=args.max_results,
+        count_only=args.count_only,
+        mirror=args.mirror,
+        fields=args.fields,
+        expand=args.expand,
+        output_format=args.output_format,
+        output=args.output,
+        shards=args.shards,
+    )
+
+
+def _setup_sync_parser(parser: ArgumentParser) -> ArgumentParser:
+    parser.add_argument(
+        "--fields",
+        "-f",
+        default=DEFAULT_MIRROR_FIELDS,
+        help="Comma-separated list of fields to store in the mirror.",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Download the whole result set instead of only updated issues.",
+    )
+    parser.add_argument(
+        "--scan",
+        action="store_true",
+        help="List every matching key to drop issues that no longer match, "
+        "even if the last scan is recent.",
     )
+    parser.add_argument("query")
+    return parser
+
+
+def sync() -> None:
+    """Sync JQL search results into the local mirror."""
+    parser = _setup_sync_parser(
+        ArgumentParser(formatter_class=ArgumentDefaultsHelpFormatter)
+    )
+    args = parser.parse_args()
+    cli_sync(query=args.query, fields=args.fields, full=args.full, scan=args.scan)
 
 
 def _setup_reassign_parser(parser: ArgumentParser) -> ArgumentParser:
@@ -254,6 +340,7 @@ SUBPARSERS = {
     "make-linked": (cli_make_linked, _setup_make_linked_parser),
     "comment": (cli_add_comment, _setup_comment_parser),
     "search": (cli_search, _setup_search_parser),
+    "sync": (cli_sync, _setup_sync_parser),
     "assign": (cli_reassign, _setup_reassign_parser),
     "make-config": (cli_example_config, _setup_config_parser),
 }
@@ -8,7 +8,7 @@ from .helpers import check_for_valid_user, get_issue_by_id
 def cli_reassign(jira_id: str, user: str) -> None:
     """Change issue assignment."""
     client = get_client()
-    get_issue_by_id(jira_id)
+    get_issue_by_id(jira_id, fields="key")
     check_for_valid_user(user)
     try:
         client.assign_issue(jira_id, user)
@@ -1,19 +1,87 @@
 """Search command."""
-from typing import Optional
+import sys
+from typing import Iterable, Optional, Union
 
-from .utils import get_client
+from .export import WRITERS, field_names, open_output
+from .mirror import count_mirrored, is_fresh, iter_mirrored, open_mirror
+from .records import DEFAULT_SEARCH_FIELDS, IssueRecord, IssueSearch
+from .records import count_issues, with_fields
+from .sharding import ShardedSearch
 
 
-def cli_search(query, max_results: Optional[int], count_only: bool) -> None:
-    """Search using JQL and return matches."""
-    client = get_client()
+def _print_count(query: str, count: int, output_format: str) -> None:
+    # Keep stdout clean for machine-readable formats.
+    stream = sys.stdout if output_format == "text" else sys.stderr
+    print('Search for "{}" returned {} results'.format(query, count), file=stream)
+
+
+def _write_results(
+    results: Iterable[IssueRecord], fields: str, output_format: str, output: str
+) -> None:
+    with open_output(output) as out:
+        WRITERS[output_format](results, field_names(fields), out)
+
+
+def _search_mirror(
+    query: str,
+    max_results: Optional[int],
+    count_only: bool,
+    fields: str,
+    output_format: str,
+    output: str,
+) -> bool:
+    connection = open_mirror()
+    if not is_fresh(query, fields=fields, connection=connection):
+        return False
 
-    results = client.search_issues(
-        query, maxResults=False if count_only else max_results
+    count = count_mirrored(query, connection=connection)
+    if not count_only and max_results:
+        count = min(count, max_results)
+    _print_count(query, count, output_format)
+    if not count_only:
+        results = iter_mirrored(query, max_results, connection)
+        _write_results(results, fields, output_format, output)
+    return True
+
+
+def cli_search(
+    query,
+    max_results: Optional[int],
+    count_only: bool,
+    mirror: bool = False,
+    fields: str = DEFAULT_SEARCH_FIELDS,
+    expand: Optional[str] = None,
+    output_format: str = "text",
+    output: str = "-",
+    shards: int = 0,
+) -> None:
+    """Search using JQL and return matches."""
+    fields = (
+        with_fields(fields, "summary")
+        if output_format == "text"
+        else with_fields(fields)
     )
+    # The mirror stores no expanded data, only search JIRA for that.
+    if (
+        mirror
+        and not expand
+        and _search_mirror(
+            query, max_results, count_only, fields, output_format, output
+        )
+    ):
+        return
 
-    print('Search for "{}" returned {} results'.format(query, len(results)))
     if count_only:
+        _print_count(query, count_issues(query), output_format)
         return
-    for issue in results:
-        print("{}: {}".format(issue.permalink(), issue.fields.summary))
+
+    if shards > 1:
+        results: Union[IssueSearch, ShardedSearch] = ShardedSearch(
+            query, shards, max_results=max_results, fields=fields, expand=expand
+        )
+    else:
+        results = IssueSearch(
+            query, max_results=max_results, fields=fields, expand=expand
+        )
+    _print_count(query, len(results), output_format)
+    _write_results(results, fields, output_format, output)
@@ -1,5 +1,9 @@
 """Error logging for jiratools."""
-from typing import List, Iterable
+import csv
+import json
+import os
+import sys
+from typing import Dict, Iterable, Iterator, List, Tuple
 
 from jiratools import format_as_code_block
 from jiratools.helpers import add_comment
@@ -11,12 +15,208 @@ from jiratools.formatting import (
 
 DataHeaders = List[str]
 
+ANCHOR_LENGTH = 8
+
 
 class JiraEntry:
-    """Typing mock for Jira Entry data."""
+    """
+    A known issue signature: a JIRA id and an error message that identifies it.
+
+    Any object with ``jira_id`` and ``error_message`` attributes
+    can be used wherever a ``JiraEntry`` is expected.
+
+    Args:
+        jira_id: the Issue ID of the JIRA
+        error_message: an error message substring which identifies the issue
+
+    """
+
+    __slots__ = ("jira_id", "error_message")
+
+    def __init__(self, jira_id: str, error_message: str) -> None:
+        self.jira_id = sys.intern(jira_id)
+        self.error_message = error_message
+
+    def __repr__(self) -> str:
+        """Show the entry's JIRA id and error message."""
+        return "<JiraEntry: {} {!r}>".format(self.jira_id, self.error_message)
+
+
+def _read_yaml(filename: str) -> List[Dict[str, str]]:
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError("Loading YAML signature files requires PyYAML.")
+    with open(filename) as in_file:
+        return yaml.safe_load(in_file) or []
 
-    jira_id: str
-    error_message: str
+
+def _read_json(filename: str) -> List[Dict[str, str]]:
+    with open(filename) as in_file:
+        return json.load(in_file)
+
+
+def _read_csv(filename: str) -> Iterator[Dict[str, str]]:
+    with open(filename, newline="") as in_file:
+        yield from csv.DictReader(in_file)
+
+
+def _entry_from_row(filename: str, number: int, row: Dict) -> JiraEntry:
+    missing = [
+        key
+        for key in ("jira_id", "error_message")
+        if not isinstance(row, dict) or key not in row
+    ]
+    if missing or row["jira_id"] in (None, ""):
+        raise ValueError(
+            'Signature file "{}" entry {} is missing: {}'.format(
+                filename, number, ", ".join(missing or ["jira_id"])
+            )
+        )
+    # Parsed YAML/JSON values may be numbers; an empty message never matches.
+    message = row["error_message"]
+    return JiraEntry(str(row["jira_id"]), "" if message is None else str(message))
+
+
+SIGNATURE_READERS = {
+    ".yaml": _read_yaml,
+    ".yml": _read_yaml,
+    ".json": _read_json,
+    ".csv": _read_csv,
+}
+
+
+class JiraEntryStore:
+    """
+    A collection of ``JiraEntry`` signatures indexed for matching errors.
+
+    Each distinct error message is indexed by one of its substrings of
+    ``ANCHOR_LENGTH`` characters, the one shared by the fewest messages so far,
+    so finding the entries whose message appears in an error costs
+    a dictionary lookup per error position and a check of the few messages
+    anchored there, rather than a substring search per entry.
+    Entries without an error message never match.
+
+    Args:
+        entries: the entries to store, in order
+
+    """
+
+    def __init__(self, entries: Iterable[JiraEntry] = ()) -> None:
+        self.entries: List[JiraEntry] = []
+        self._by_message: Dict[str, List[int]] = {}
+        self._by_anchor: Dict[str, List[Tuple[str, int]]] = {}
+        self._short_lengths: List[int] = []
+        for entry in entries:
+            self.add(entry)
+
+    @classmethod
+    def from_file(cls, filename: str) -> "JiraEntryStore":
+        """
+        Load a store from a YAML, JSON or CSV signature file.
+
+        YAML and JSON files hold a list of objects,
+        CSV files a header row and one row per entry,
+        each with ``jira_id`` and ``error_message`` values.
+        Values are read as strings; an empty ``error_message`` never matches.
+        YAML files need the optional ``PyYAML`` package.
+
+        Args:
+            filename: the signature file, its extension gives its format
+
+        Returns:
+            the store of the file's entries
+
+        """
+        extension = os.path.splitext(filename)[1].lower()
+        if extension not in SIGNATURE_READERS:
+            raise ValueError(
+                'Unknown signature file type "{}", expected one of: {}'.format(
+                    extension, ", ".join(SIGNATURE_READERS)
+                )
+            )
+        return cls(
+            _entry_from_row(filename, number, row)
+            for number, row in enumerate(SIGNATURE_READERS[extension](filename), 1)
+        )
+
+    def add(self, entry: JiraEntry) -> None:
+        """Add an entry to the store and its index."""
+        self.entries.append(entry)
+        message = entry.error_message
+        if not message:
+            return
+        if message not in self._by_message:
+            self._by_message[message] = []
+            if len(message) >= ANCHOR_LENGTH:
+                self._anchor(message)
+            elif len(message) not in self._short_lengths:
+                self._short_lengths.append(len(message))
+        self._by_message[message].append(len(self.entries) - 1)
+
+    def _anchor(self, message: str) -> None:
+        # Messages often share a common start (e.g. "Error code ..."),
+        # so anchor each on its least shared substring instead.
+        best_offset, best_size = 0, None
+        for offset in range(len(message) - ANCHOR_LENGTH + 1):
+            anchor = message[offset : offset + ANCHOR_LENGTH]
+            size = len(self._by_anchor.get(anchor, ()))
+            if best_size is None or size < best_size:
+                best_offset, best_size = offset, size
+                if not size:
+                    break
+        anchor = message[best_offset : best_offset + ANCHOR_LENGTH]
+        self._by_anchor.setdefault(anchor, []).append((message, best_offset))
+
+    def __iter__(self) -> Iterator[JiraEntry]:
+        """Iterate over the entries in the order they were added."""
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        """Return the number of entries."""
+        return len(self.entries)
+
+    def _messages_in(self, error: str) -> Iterator[str]:
+        """Yield each distinct indexed message that occurs in the error."""
+        found = set()
+        for position in range(len(error) - ANCHOR_LENGTH + 1):
+            anchored = self._by_anchor.get(error[position : position + ANCHOR_LENGTH])
+            if not anchored:
+                continue
+            for message, offset in anchored:
+                start = position - offset
+                if (
+                    start >= 0
+                    and message not in found
+                    and error.startswith(message, start)
+                ):
+                    found.add(message)
+                    yield message
+        for length in self._short_lengths:
+            for start in range(len(error) - length + 1):
+                message = error[start : start + length]
+                if message not in found and message in self._by_message:
+                    found.add(message)
+                    yield message
+
+    def matches(self, *errors: str) -> List[Tuple[JiraEntry, str]]:
+        """
+        Find the entries whose error message occurs in each error.
+
+        Args:
+            *errors: the error messages to check
+
+        Returns:
+            ``(entry, error)`` pairs, ordered by entry and then by error
+
+        """
+        positions = [
+            (entry_position, error_position)
+            for error_position, error in enumerate(errors)
+            for message in self._messages_in(error)
+            for entry_position in self._by_message[message]
+        ]
+        return [(self.entries[x], errors[y]) for x, y in sorted(positions)]
 
 
 def add_jira_error_comment(jira_id: str, error_msg: str, **format_kwargs) -> str:
@@ -81,13 +281,16 @@ def update_jira_for_errors(
     Auto-Update JIRAs if errors are found that match the jira list.
 
     Args:
-        jiras: an iterable of objects
+        jiras: a ``JiraEntryStore``, or an iterable of objects
             that each contain two required attributes
 
             - jira_id: the Issue Id of the JIRA to be updated
             - error_message: an error message substring which, if found,
               will trigger and update of the JIRA with the actual error message.
 
+            A ``JiraEntryStore`` reuses its index across calls,
+            which is much faster for many entries.
+
         *errors: an error message to be checked against the ``jiras`` for a match
         **format_kwargs: formatting keyword args
             to be passed to jiratools.formatting.format_jira_msg
@@ -96,6 +299,12 @@ def update_jira_for_errors(
         A list of JIRA Issue IDs that were updated.
 
     """
+    if isinstance(jiras, JiraEntryStore):
+        return [
+            add_jira_error_comment(jira.jira_id, error, **format_kwargs)
+            for jira, error in jiras.matches(*errors)
+        ]
+
     jiras_commented = []
     for jira in jiras:
         for error in errors:
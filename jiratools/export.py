@@ -0,0 +1,140 @@
+"""Streaming export of search results."""
+from contextlib import contextmanager
+import csv
+from itertools import islice
+import json
+import sys
+from typing import Any, Callable, Dict, Iterable, Iterator, List, TextIO
+
+from .records import IssueRecord
+
+OUTPUT_BUFFER_SIZE = 1 << 16
+COLUMN_BATCH_SIZE = 1000
+RECORD_COLUMNS = ["key", "permalink"]
+
+Writer = Callable[[Iterable[IssueRecord], List[str], TextIO], int]
+
+
+def field_names(fields: str) -> List[str]:
+    """
+    Split a comma-separated field list into the names of the field columns.
+
+    Names are de-duplicated, and ``key`` and ``permalink`` are dropped,
+    as every record already has those columns.
+    """
+    names: List[str] = []
+    for name in (x.strip() for x in fields.split(",")):
+        if name and name not in names and name not in RECORD_COLUMNS:
+            names.append(name)
+    return names
+
+
+def flatten_value(value: Any) -> Any:
+    """
+    Reduce a raw JIRA field value to a scalar.
+
+    Objects such as statuses, users or components are reduced to their name,
+    lists to a comma-separated string of their flattened items.
+
+    Args:
+        value: a field value from an issue's raw JSON
+
+    Returns:
+        a string, number, boolean or None
+
+    """
+    if isinstance(value, dict):
+        for name in ("name", "value", "displayName", "key", "id"):
+            if name in value:
+                return value[name]
+        return json.dumps(value)
+    if isinstance(value, list):
+        return ",".join(str(flatten_value(x)) for x in value)
+    return value
+
+
+def _row(record: IssueRecord, names: List[str]) -> List[Any]:
+    return [record.key, record.permalink] + [
+        flatten_value(record.fields.get(name)) for name in names
+    ]
+
+
+def write_text(records: Iterable[IssueRecord], names: List[str], out: TextIO) -> int:
+    """Write ``permalink: summary`` lines, returning the number of records."""
+    count = 0
+    for count, record in enumerate(records, 1):
+        out.write("{}: {}\n".format(record.permalink, record.fields.get("summary")))
+    return count
+
+
+def write_jsonl(records: Iterable[IssueRecord], names: List[str], out: TextIO) -> int:
+    """Write one JSON object per record, returning the number of records."""
+    count = 0
+    for count, record in enumerate(records, 1):
+        data: Dict[str, Any] = {"key": record.key, "permalink": record.permalink}
+        data.update((name, record.fields.get(name)) for name in names)
+        out.write(json.dumps(data))
+        out.write("\n")
+    return count
+
+
+def write_csv(records: Iterable[IssueRecord], names: List[str], out: TextIO) -> int:
+    """Write a CSV header and one row per record, returning the number of records."""
+    writer = csv.writer(out)
+    writer.writerow(RECORD_COLUMNS + names)
+    count = 0
+    for count, record in enumerate(records, 1):
+        writer.writerow(_row(record, names))
+    return count
+
+
+def write_columns(records: Iterable[IssueRecord], names: List[str], out: TextIO) -> int:
+    """
+    Write records as column-oriented JSON batches.
+
+    Each line is one batch of up to ``COLUMN_BATCH_SIZE`` records,
+    as a JSON object mapping every column name to a list of flattened values,
+    ready to be read as record batches by columnar tools such as Arrow.
+
+    Returns:
+        the number of records written
+
+    """
+    columns = RECORD_COLUMNS + names
+    records = iter(records)
+    count = 0
+    while True:
+        batch = [_row(x, names) for x in islice(records, COLUMN_BATCH_SIZE)]
+        if not batch:
+            return count
+        count += len(batch)
+        out.write(json.dumps(dict(zip(columns, map(list, zip(*batch))))))
+        out.write("\n")
+
+
+WRITERS: Dict[str, Writer] = {
+    "text": write_text,
+    "jsonl": write_jsonl,
+    "csv": write_csv,
+    "columns": write_columns,
+}
+
+
+@contextmanager
+def open_output(filename: str) -> Iterator[TextIO]:
+    """
+    Open a buffered output stream, ``-`` for stdout.
+
+    Args:
+        filename: the file to (over)write
+
+    Yields:
+        the writable text stream
+
+    """
+    if filename == "-":
+        yield sys.stdout
+        sys.stdout.flush()
+        return
+    with open(filename, "w", newline="", buffering=OUTPUT_BUFFER_SIZE) as out:
+        yield out
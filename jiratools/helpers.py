@@ -1,5 +1,6 @@
 """A collection of helpers for JIRA commands."""
-from typing import List
+import re
+from typing import List, Optional, Tuple
 
 import jira
 from jgt_common import exit, error_if
@@ -8,13 +9,19 @@ import requests
 from .utils import DEFAULT_LINK_TYPE
 from .utils import get_client, load_config
 
+ORDER_BY_PATTERN = re.compile(r"\border\s+by\b", re.IGNORECASE)
 
-def get_issue_by_id(jira_id: str) -> jira.resources.Issue:
+
+def get_issue_by_id(
+    jira_id: str, fields: Optional[str] = None, expand: Optional[str] = None
+) -> jira.resources.Issue:
     """
     Find the JIRA of a given id, or exit if not found.
 
     Args:
         jira_id: the id of the desired JIRA
+        fields: comma-separated names of the fields to fetch, all if not given
+        expand: comma-separated names of the extra data to expand
 
     Returns:
         the issue with the provided id
@@ -22,7 +29,7 @@ def get_issue_by_id(jira_id: str) -> jira.resources.Issue:
     """
     client = get_client()
     try:
-        dev_jira = client.issue(jira_id)
+        dev_jira = client.issue(jira_id, fields=fields, expand=expand)
     except jira.exceptions.JIRAError:
         print("JIRA {} was not found!".format(jira_id))
         exit(1)
@@ -116,3 +123,41 @@ def check_for_valid_user(user: str) -> None:
     except jira.exceptions.JIRAError as e:
         print("There was a problem finding user {}. Error message: {}.".format(user, e))
         exit(1)
+
+
+def split_order_by(query: str) -> Tuple[str, str]:
+    """
+    Split a JQL query into its conditions and its ``ORDER BY`` clause.
+
+    Args:
+        query: the JQL query
+
+    Returns:
+        the conditions and the ``ORDER BY`` clause, either may be empty
+
+    """
+    matches = list(ORDER_BY_PATTERN.finditer(query))
+    if not matches:
+        return query.strip(), ""
+    start = matches[-1].start()
+    return query[:start].strip(), query[start:].strip()
+
+
+def add_jql_clause(query: str, clause: str) -> str:
+    """
+    Narrow a JQL query with an extra clause.
+
+    The clause is ANDed onto the query's conditions,
+    keeping any trailing ``ORDER BY`` of the query at the end.
+
+    Args:
+        query: the JQL query to narrow
+        clause: a JQL condition, e.g. ``updated >= "-5m"``
+
+    Returns:
+        the combined JQL query
+
+    """
+    query, order_by = split_order_by(query)
+    combined = "({}) AND {}".format(query, clause) if query else clause
+    return " ".join(filter(None, (combined, order_by)))
@@ -1,11 +1,96 @@
 """Make a linked story command."""
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import uuid
 
-from .utils import get_client
+import jira
+from jgt_common import exit
+from requests import RequestException
+
+from .utils import JOURNAL_DIRNAME
+from .utils import get_client, load_config
 from .helpers import get_issue_by_id, component_id_from_name, link_jiras
 
+try:
+    import fcntl
+except ImportError:  # Windows has no flock; runs are then not locked.
+    fcntl = None  # type: ignore
 
-def cli_make_linked(
+MAX_WORKERS = 8
+
+Journal = Dict
+
+
+def journal_dirname() -> str:
+    """Return the make-linked journal directory, ``JOURNAL_DIR`` in ``jira.config``."""
+    return load_config().get("JOURNAL_DIR") or JOURNAL_DIRNAME
+
+
+def _journal_path(jira_id: str) -> str:
+    return os.path.join(journal_dirname(), "{}.json".format(jira_id))
+
+
+def load_journal(jira_id: str) -> Optional[Journal]:
+    """
+    Load the journal of an unfinished make-linked run.
+
+    Args:
+        jira_id: the id of the JIRA being linked to
+
+    Returns:
+        the journal, or None if there is no unfinished run
+
+    """
+    try:
+        with open(_journal_path(jira_id)) as journal_file:
+            return json.load(journal_file)
+    except FileNotFoundError:
+        return None
+
+
+def save_journal(journal: Journal) -> None:
+    """Atomically (over)write the journal of a make-linked run."""
+    os.makedirs(journal_dirname(), exist_ok=True)
+    path = _journal_path(journal["jira_id"])
+    with open(path + ".tmp", "w") as journal_file:
+        json.dump(journal, journal_file)
+    os.replace(path + ".tmp", path)
+
+
+def clear_journal(jira_id: str) -> None:
+    """Remove the journal of a make-linked run, if any."""
+    try:
+        os.remove(_journal_path(jira_id))
+    except FileNotFoundError:
+        pass
+
+
+@contextmanager
+def _journal_lock(jira_id: str) -> Iterator[None]:
+    """Hold the lock on a JIRA's journal, or exit if another run holds it."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(journal_dirname(), exist_ok=True)
+    with open(_journal_path(jira_id) + ".lock", "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            message = 'ERROR: another make-linked run for "{}" is in progress.'
+            print(message.format(jira_id))
+            exit(1)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _linked_issue_data(
+    client: jira.JIRA,
     jira_id: str,
     project: str,
     summary: str,
@@ -15,11 +100,8 @@ def cli_make_linked(
     assign: bool,
     labels: List[str],
     components: List[str],
-    watchers: str,
-) -> None:
-    """Build a new story linked to the given one."""
-    client = get_client()
-    dev_jira = get_issue_by_id(jira_id)
+) -> Dict[str, Any]:
+    dev_jira = get_issue_by_id(jira_id, fields="summary")
     issue_data = {
         "project": project,
         "summary": summary.format(
@@ -41,8 +123,241 @@ def cli_make_linked(
                 for x in components
             ]
         )
-    test_jira = client.create_issue(**issue_data)
-    link_jiras(test_jira.key, dev_jira.key, client=client)
+    return issue_data
+
+
+def _run_steps(steps: Dict[str, Callable[[], None]]) -> Dict[str, BaseException]:
+    if not steps:
+        return {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=min(len(steps), MAX_WORKERS)) as executor:
+        futures = {name: executor.submit(step) for name, step in steps.items()}
+    for name, future in futures.items():
+        error = future.exception()
+        if error is not None:
+            errors[name] = error
+    return errors
+
+
+def _error_text(error: BaseException) -> str:
+    return getattr(error, "text", None) or str(error)
+
+
+def _tracking_label(journal: Journal) -> str:
+    return "jiratools-make-linked-{}".format(journal["token"])
+
+
+def _find_tracked_issue(
+    client: jira.JIRA, journal: Journal
+) -> Optional[jira.resources.Issue]:
+    """Find the issue an interrupted run may have made, by its tracking label."""
+    found = client.search_issues(
+        'labels = "{}"'.format(_tracking_label(journal)), maxResults=1, fields="key"
+    )
+    return found[0] if found else None
+
+
+def _finish_linked_issue(
+    client: jira.JIRA, journal: Journal, watchers: List[str]
+) -> Dict[str, BaseException]:
+    """Run the remaining steps concurrently, journaling each as it completes."""
+    # The steps share one client rather than one per thread: each step is
+    # a single request that leaves the session's auth and headers alone,
+    # requests sends them through urllib3's thread-safe connection pool,
+    # and the session's cookie jar guards its own updates with a lock.
+    lock = threading.Lock()
+    test_jira_id = journal["test_jira"]
+
+    def record(update: Callable[[], None]) -> None:
+        with lock:
+            update()
+            save_journal(journal)
+
+    def link() -> None:
+        link_jiras(test_jira_id, journal["jira_id"], client=client)
+        record(lambda: journal.update(linked=True))
+
+    def untag() -> None:
+        # The journal now holds the issue key, so the label is no longer needed.
+        client.issue(test_jira_id, fields="key").update(
+            update={"labels": [{"remove": _tracking_label(journal)}]}
+        )
+        record(lambda: journal.update(untagged=True))
+
+    def watch(to_watch: str) -> Callable[[], None]:
+        def add_watcher() -> None:
+            client.add_watcher(test_jira_id, to_watch)
+            record(lambda: journal["watchers"].append(to_watch))
+
+        return add_watcher
+
+    steps = {}
+    if not journal["linked"]:
+        steps["make the link"] = link
+    if journal["tracked"] and not journal["untagged"]:
+        steps["remove the tracking label"] = untag
     for to_watch in watchers:
-        client.add_watcher(test_jira.key, to_watch)
-    print("Test JIRA Created: {}".format(test_jira.permalink()))
+        if to_watch not in journal["watchers"]:
+            steps['add watcher "{}"'.format(to_watch)] = watch(to_watch)
+    return _run_steps(steps)
+
+
+def _rollback_linked(jira_id: str) -> None:
+    journal = load_journal(jira_id)
+    if journal is None:
+        print('No unfinished make-linked run for "{}" to roll back.'.format(jira_id))
+        return
+    client = get_client()
+    try:
+        test_jira = journal["test_jira"]
+        if test_jira is None and journal["creating"] and journal["tracked"]:
+            tracked = _find_tracked_issue(client, journal)
+            test_jira = tracked.key if tracked else None
+        if test_jira is not None:
+            print("Deleting partially made Test JIRA: {}".format(test_jira))
+            client.issue(test_jira, fields="key").delete()
+        elif journal["creating"]:
+            print(
+                "No Test JIRA was recorded; check project {} for one made "
+                "by the interrupted run.".format(journal["args"]["project"])
+            )
+    except (jira.exceptions.JIRAError, RequestException) as e:
+        print('ERROR: "{}" trying to roll back "{}".'.format(_error_text(e), jira_id))
+        exit(1)
+    clear_journal(jira_id)
+
+
+def _resume_or_create(client: jira.JIRA, journal: Journal) -> jira.resources.Issue:
+    args = journal["args"]
+    if journal["creating"]:
+        # An earlier run stopped without knowing whether its create succeeded.
+        if not journal["tracked"]:
+            print(
+                'ERROR: the last run for "{}" stopped while creating its Test JIRA, '
+                "which may exist in project {}.".format(
+                    journal["jira_id"], args["project"]
+                )
+            )
+            print("Delete it if so, then use --rollback to start over.")
+            exit(1)
+        tracked = _find_tracked_issue(client, journal)
+        if tracked is not None:
+            return tracked
+
+    labels = args["labels"]
+    if journal["tracked"]:
+        labels = labels + [_tracking_label(journal)]
+    issue_data = _linked_issue_data(
+        client,
+        journal["jira_id"],
+        project=args["project"],
+        summary=args["summary"],
+        description=args["description"],
+        issue_type=args["issue_type"],
+        user=args["user"],
+        assign=args["assign"],
+        labels=labels,
+        components=args["components"],
+    )
+    journal.update(creating=True)
+    save_journal(journal)
+    try:
+        return client.create_issue(**issue_data)
+    except jira.exceptions.JIRAError:
+        # JIRA answered, so nothing was made and a rerun can simply retry.
+        journal.update(creating=False)
+        save_journal(journal)
+        raise
+
+
+def _make_linked(jira_id: str, args: Dict[str, Any], track: bool) -> None:
+    client = get_client()
+    journal = load_journal(jira_id)
+    if journal is None:
+        journal = {
+            "jira_id": jira_id,
+            "args": args,
+            "token": uuid.uuid4().hex,
+            "tracked": track,
+            "creating": False,
+            "test_jira": None,
+            "permalink": None,
+            "linked": False,
+            "untagged": False,
+            "watchers": [],
+        }
+        save_journal(journal)
+    elif journal["args"] != args:
+        message = 'ERROR: the unfinished make-linked run for "{}" used other options.'
+        print(message.format(jira_id))
+        print("Rerun it with the same options, or use --rollback to abandon it.")
+        exit(1)
+    elif journal["test_jira"] is not None:
+        print("Resuming with Test JIRA: {}".format(journal["permalink"]))
+
+    if journal["test_jira"] is None:
+        try:
+            test_jira = _resume_or_create(client, journal)
+        except (jira.exceptions.JIRAError, RequestException) as e:
+            print('ERROR: "{}" trying to create the Test JIRA.'.format(_error_text(e)))
+            print("Rerun to retry, or use --rollback to abandon this run.")
+            exit(1)
+        journal.update(test_jira=test_jira.key, permalink=test_jira.permalink())
+        save_journal(journal)
+
+    errors = _finish_linked_issue(client, journal, args["watchers"])
+    if errors:
+        for step, error in errors.items():
+            print('ERROR: "{}" trying to {}.'.format(_error_text(error), step))
+        print(
+            "Test JIRA {} is incomplete: rerun to retry the failed steps, "
+            "or use --rollback to delete it.".format(journal["permalink"])
+        )
+        exit(1)
+
+    clear_journal(jira_id)
+    print("Test JIRA Created: {}".format(journal["permalink"]))
+
+
+def cli_make_linked(
+    jira_id: str,
+    project: str,
+    summary: str,
+    description: str,
+    issue_type: str,
+    user: str,
+    assign: bool,
+    labels: List[str],
+    components: List[str],
+    watchers: List[str],
+    rollback: bool = False,
+    track: bool = False,
+) -> None:
+    """
+    Build a new story linked to the given one.
+
+    Progress is journaled, so rerunning with the same options after a failure
+    resumes the unfinished steps instead of making another story;
+    ``rollback`` deletes the story an unfinished run made instead.
+    ``track`` labels the story while it is being made, so that a rerun
+    can find it even if the run stopped before the create call returned.
+    """
+    with _journal_lock(jira_id):
+        if rollback:
+            _rollback_linked(jira_id)
+        else:
+            _make_linked(
+                jira_id,
+                {
+                    "project": project,
+                    "summary": summary,
+                    "description": description,
+                    "issue_type": issue_type,
+                    "user": user,
+                    "assign": assign,
+                    "labels": labels or [],
+                    "components": components or [],
+                    "watchers": watchers or [],
+                },
+                track,
+            )
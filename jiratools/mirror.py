@@ -0,0 +1,308 @@
+"""Local sqlite mirror of JQL search results."""
+from itertools import count, repeat
+import json
+import math
+import sqlite3
+import time
+from typing import Iterable, Iterator, Optional
+
+import jira
+
+from .helpers import add_jql_clause
+from .records import IssueRecord, IssueSearch, with_fields
+from .utils import DEFAULT_MIRROR_MAX_AGE, DEFAULT_MIRROR_SCAN_INTERVAL, MIRROR_FILENAME
+from .utils import get_client, load_config
+
+DEFAULT_MIRROR_FIELDS = "summary"
+SCHEMA_VERSION = 2
+KEY_CHUNK_SIZE = 100
+# JIRA clamps this to its own limit, but asks for as many keys per page as allowed.
+KEY_PAGE_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS syncs (
+    query TEXT PRIMARY KEY,
+    fields TEXT NOT NULL,
+    last_sync REAL NOT NULL,
+    last_scan REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS issues (
+    query TEXT NOT NULL,
+    key TEXT NOT NULL,
+    position INTEGER,
+    permalink TEXT NOT NULL,
+    updated TEXT,
+    fields TEXT NOT NULL,
+    PRIMARY KEY (query, key)
+);
+CREATE INDEX IF NOT EXISTS issues_by_position ON issues (query, position);
+CREATE INDEX IF NOT EXISTS issues_by_key ON issues (key);
+"""
+
+
+def mirror_filename() -> str:
+    """Return the mirror database path, ``MIRROR_FILE`` in ``jira.config``."""
+    return load_config().get("MIRROR_FILE") or MIRROR_FILENAME
+
+
+def mirror_max_age() -> float:
+    """Return the seconds a mirrored query stays fresh, ``MIRROR_MAX_AGE``."""
+    return float(load_config().get("MIRROR_MAX_AGE") or DEFAULT_MIRROR_MAX_AGE)
+
+
+def mirror_scan_interval() -> float:
+    """Return the seconds between key scans of a query, ``MIRROR_SCAN_INTERVAL``."""
+    return float(
+        load_config().get("MIRROR_SCAN_INTERVAL") or DEFAULT_MIRROR_SCAN_INTERVAL
+    )
+
+
+def open_mirror(filename: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Open (creating if needed) the mirror database.
+
+    Args:
+        filename: the database file, defaults to ``mirror_filename()``
+
+    Returns:
+        a connection to the mirror database
+
+    """
+    connection = sqlite3.connect(filename or mirror_filename())
+    (version,) = connection.execute("PRAGMA user_version").fetchone()
+    if version != SCHEMA_VERSION:
+        # The mirror is only a cache, so an outdated one is simply rebuilt.
+        connection.executescript(
+            "DROP TABLE IF EXISTS syncs; DROP TABLE IF EXISTS issues;"
+        )
+        connection.execute("PRAGMA user_version = {}".format(SCHEMA_VERSION))
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def _store(
+    connection: sqlite3.Connection,
+    query: str,
+    issues: Iterable[IssueRecord],
+    positions: Iterable[Optional[int]],
+) -> int:
+    # Issues already mirrored keep their position, new ones take the given one.
+    rows = [
+        (
+            query,
+            issue.key,
+            query,
+            issue.key,
+            position,
+            issue.permalink,
+            issue.fields.get("updated"),
+            json.dumps(issue.fields),
+        )
+        for issue, position in zip(issues, positions)
+    ]
+    connection.executemany(
+        "INSERT OR REPLACE INTO issues VALUES (?, ?, COALESCE("
+        "(SELECT position FROM issues WHERE query = ? AND key = ?), ?"
+        "), ?, ?, ?)",
+        rows,
+    )
+    return len(rows)
+
+
+def _scan_keys(
+    connection: sqlite3.Connection, query: str, fields: str, client: jira.JIRA
+) -> int:
+    # Listing just the keys catches issues that left the results
+    # (or joined them) without being updated themselves.
+    keys = [
+        x.key
+        for x in IssueSearch(
+            query, fields="key", client=client, page_size=KEY_PAGE_SIZE
+        )
+    ]
+    current = set(keys)
+    mirrored = {
+        key
+        for key, in connection.execute(
+            "SELECT key FROM issues WHERE query = ?", (query,)
+        )
+    }
+    connection.executemany(
+        "DELETE FROM issues WHERE query = ? AND key = ?",
+        ((query, key) for key in mirrored - current),
+    )
+    missing = [key for key in keys if key not in mirrored]
+    downloaded = 0
+    for start in range(0, len(missing), KEY_CHUNK_SIZE):
+        chunk = missing[start : start + KEY_CHUNK_SIZE]
+        jql = "key in ({})".format(",".join('"{}"'.format(x) for x in chunk))
+        downloaded += _store(
+            connection,
+            query,
+            IssueSearch(jql, fields=fields, client=client),
+            repeat(None),
+        )
+    connection.executemany(
+        "UPDATE issues SET position = ? WHERE query = ? AND key = ?",
+        ((position, query, key) for position, key in enumerate(keys)),
+    )
+    return downloaded
+
+
+def _sync_incremental(
+    connection: sqlite3.Connection,
+    query: str,
+    fields: str,
+    last_sync: float,
+    client: jira.JIRA,
+) -> int:
+    # Relative dates avoid any client/server time zone mismatch;
+    # the extra minute covers JQL's minute resolution.
+    minutes = math.ceil((time.time() - last_sync) / 60) + 1
+    jql = add_jql_clause(query, 'updated >= "-{}m"'.format(minutes))
+    (end,) = connection.execute(
+        "SELECT COALESCE(MAX(position) + 1, 0) FROM issues WHERE query = ?", (query,)
+    ).fetchone()
+    # Until the next key scan, issues new to the results go after the others.
+    return _store(
+        connection, query, IssueSearch(jql, fields=fields, client=client), count(end)
+    )
+
+
+def sync_query(
+    query: str,
+    fields: str = DEFAULT_MIRROR_FIELDS,
+    full: bool = False,
+    scan: Optional[bool] = None,
+    connection: Optional[sqlite3.Connection] = None,
+    client: Optional[jira.JIRA] = None,
+) -> int:
+    """
+    Bring the mirrored results of a JQL query up to date.
+
+    The first sync of a query (or a sync with different ``fields``)
+    downloads the whole result set;
+    later syncs download the issues updated since the previous sync.
+    Issues that stop matching the query without being updated,
+    or are updated so that they no longer match, are only noticed by a key scan,
+    which lists the keys of every matching issue
+    to drop the departed ones and restore the query's order.
+
+    Args:
+        query: the JQL query to mirror
+        fields: comma-separated names of the fields to store
+        full: download the whole result set even if it was synced before
+        scan: whether to scan the keys, by default only if the last scan
+            was more than ``mirror_scan_interval()`` seconds ago
+        connection: an open mirror database, see ``open_mirror``
+        client: the instantiated JIRA client
+
+    Returns:
+        the number of issues downloaded
+
+    """
+    connection = connection or open_mirror()
+    client = client or get_client()
+    fields = with_fields(fields, "updated")
+    previous = connection.execute(
+        "SELECT fields, last_sync, last_scan FROM syncs WHERE query = ?", (query,)
+    ).fetchone()
+
+    started = time.time()
+    with connection:
+        if previous is not None and previous[0] == fields and not full:
+            last_scan = previous[2]
+            if scan is None:
+                scan = started - last_scan > mirror_scan_interval()
+            downloaded = _sync_incremental(
+                connection, query, fields, previous[1], client
+            )
+            if scan:
+                downloaded += _scan_keys(connection, query, fields, client)
+                last_scan = started
+        else:
+            connection.execute("DELETE FROM issues WHERE query = ?", (query,))
+            issues = IssueSearch(query, fields=fields, client=client)
+            downloaded = _store(connection, query, issues, count())
+            last_scan = started
+        connection.execute(
+            "INSERT OR REPLACE INTO syncs VALUES (?, ?, ?, ?)",
+            (query, fields, started, last_scan),
+        )
+    return downloaded
+
+
+def is_fresh(
+    query: str,
+    fields: str = DEFAULT_MIRROR_FIELDS,
+    max_age: Optional[float] = None,
+    connection: Optional[sqlite3.Connection] = None,
+) -> bool:
+    """
+    Check whether the mirror holds a recent enough copy of a query's results.
+
+    Args:
+        query: the JQL query, exactly as it was synced
+        fields: comma-separated names of the fields that must be stored
+        max_age: seconds since the last sync, defaults to ``mirror_max_age()``
+        connection: an open mirror database, see ``open_mirror``
+
+    Returns:
+        True if the query was synced with ``fields`` within ``max_age`` seconds
+
+    """
+    connection = connection or open_mirror()
+    max_age = mirror_max_age() if max_age is None else max_age
+    row = connection.execute(
+        "SELECT fields, last_sync FROM syncs WHERE query = ?", (query,)
+    ).fetchone()
+    if row is None or time.time() - row[1] > max_age:
+        return False
+    stored = row[0].split(",")
+    return all(x in stored for x in with_fields(fields).split(","))
+
+
+def count_mirrored(query: str, connection: Optional[sqlite3.Connection] = None) -> int:
+    """Return the number of mirrored issues for the query."""
+    connection = connection or open_mirror()
+    return connection.execute(
+        "SELECT COUNT(*) FROM issues WHERE query = ?", (query,)
+    ).fetchone()[0]
+
+
+def iter_mirrored(
+    query: str,
+    max_results: Optional[int] = None,
+    connection: Optional[sqlite3.Connection] = None,
+) -> Iterator[IssueRecord]:
+    """
+    Yield the mirrored issues for the query, in the query's order.
+
+    The order is the one found by the last key scan (see ``sync_query``),
+    with issues that joined the results since then at the end.
+
+    Args:
+        query: the JQL query, exactly as it was synced
+        max_results: the most issues to yield, falsy for no limit
+        connection: an open mirror database, see ``open_mirror``
+
+    Yields:
+        an ``IssueRecord`` for each issue
+
+    """
+    connection = connection or open_mirror()
+    rows = connection.execute(
+        "SELECT key, permalink, fields FROM issues WHERE query = ?"
+        " ORDER BY position LIMIT ?",
+        (query, max_results or -1),
+    )
+    for key, permalink, fields in rows:
+        yield IssueRecord(key, permalink, json.loads(fields))
+
+
+def cli_sync(query: str, fields: str, full: bool, scan: bool = False) -> None:
+    """Sync a JQL query's results into the local mirror."""
+    downloaded = sync_query(query, fields=fields, full=full, scan=scan or None)
+    print(
+        'Synced {} issues for "{}" into {}'.format(downloaded, query, mirror_filename())
+    )
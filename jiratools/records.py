@@ -0,0 +1,167 @@
+"""Lightweight issue records for JQL searches."""
+from typing import Dict, Iterator, List, Optional
+
+import jira
+
+from .utils import get_client
+
+DEFAULT_SEARCH_FIELDS = "summary"
+PAGE_SIZE = 100
+
+
+def with_fields(fields: str, *required: str) -> str:
+    """
+    Normalize a comma-separated field list, adding any missing required names.
+
+    Surrounding whitespace and empty names are dropped.
+
+    Args:
+        fields: comma-separated field names
+        *required: field names that must be in the list
+
+    Returns:
+        the comma-separated field names, including ``required``
+
+    """
+    names = [x.strip() for x in fields.split(",") if x.strip()]
+    names.extend(x for x in required if x not in names)
+    return ",".join(names)
+
+
+class IssueRecord:
+    """
+    A lightweight stand-in for ``jira.resources.Issue``.
+
+    Holds only the issue key, its permalink, and the raw JSON of the fields
+    that were requested, instead of a full resource object per issue.
+    """
+
+    __slots__ = ("key", "permalink", "fields")
+
+    def __init__(self, key: str, permalink: str, fields: Dict) -> None:
+        self.key = key
+        self.permalink = permalink
+        self.fields = fields
+
+    def __repr__(self) -> str:
+        """Identify the record by its issue key."""
+        return "<IssueRecord: {}>".format(self.key)
+
+
+class IssueSearch:
+    """
+    A JQL search that pages in its results as ``IssueRecord`` objects.
+
+    Only the requested ``fields`` are downloaded,
+    and pages are fetched as the search is iterated,
+    so large result sets are never held in memory all at once.
+    ``len()`` gives the number of results the search will yield.
+
+    Args:
+        query: the JQL query
+        max_results: the most issues to return, falsy for no limit
+        fields: comma-separated names of the fields to fetch
+        expand: comma-separated names of the extra data to expand
+        client: the instantiated JIRA client
+        page_size: the number of issues to request per page
+
+    """
+
+    def __init__(
+        self,
+        query: str,
+        max_results: Optional[int] = None,
+        fields: str = DEFAULT_SEARCH_FIELDS,
+        expand: Optional[str] = None,
+        client: Optional[jira.JIRA] = None,
+        page_size: int = PAGE_SIZE,
+    ) -> None:
+        self.query = query
+        self.max_results = max_results or None
+        self.fields = with_fields(fields)
+        self.expand = expand
+        self.client = client or get_client()
+        self.page_size = page_size
+        self._server = self.client.client_info()
+        self._first_page: Optional[Dict] = None
+        # JIRA translates friendly names (e.g. "Epic Link") to field ids
+        # in the request, but raw results are keyed by id only.
+        ids = getattr(self.client, "_fields", None) or {}
+        self._names_by_id = {
+            ids[name]: name
+            for name in self.fields.split(",")
+            if ids.get(name, name) != name
+        }
+
+    def _fetch_page(self, start_at: int) -> Dict:
+        page_size = self.page_size
+        if self.max_results:
+            page_size = min(page_size, self.max_results - start_at)
+        return self.client.search_issues(
+            self.query,
+            startAt=start_at,
+            maxResults=page_size,
+            fields=self.fields,
+            expand=self.expand,
+            json_result=True,
+        )
+
+    def _fields(self, issue: Dict) -> Dict:
+        fields = issue.get("fields", {})
+        for field_id, name in self._names_by_id.items():
+            if field_id in fields:
+                fields[name] = fields[field_id]
+        return fields
+
+    def _records(self, page: Dict) -> List[IssueRecord]:
+        return [
+            IssueRecord(
+                issue["key"],
+                "{}/browse/{}".format(self._server, issue["key"]),
+                self._fields(issue),
+            )
+            for issue in page["issues"]
+        ]
+
+    @property
+    def total(self) -> int:
+        """Return the number of issues matching the query on the server."""
+        if self._first_page is None:
+            self._first_page = self._fetch_page(0)
+        return self._first_page["total"]
+
+    def __len__(self) -> int:
+        """Return the number of issues the search will yield."""
+        if self.max_results:
+            return min(self.total, self.max_results)
+        return self.total
+
+    def __iter__(self) -> Iterator[IssueRecord]:
+        """Page through the search results."""
+        page = self._first_page
+        if page is None or "issues" not in page:
+            page = self._fetch_page(0)
+        # Keep only the total, so iterating doesn't pin the first page in memory.
+        self._first_page = {"total": page["total"]}
+        fetched = 0
+        while page["issues"]:
+            yield from self._records(page)
+            fetched += len(page["issues"])
+            if fetched >= len(self):
+                break
+            page = self._fetch_page(fetched)
+
+
+def count_issues(query: str, client: Optional[jira.JIRA] = None) -> int:
+    """
+    Count the issues matching a JQL query without downloading them.
+
+    Args:
+        query: the JQL query
+        client: the instantiated JIRA client
+
+    Returns:
+        the number of matching issues
+
+    """
+    return IssueSearch(query, fields="key", client=client, page_size=1).total
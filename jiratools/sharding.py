@@ -0,0 +1,231 @@
+"""Parallel sharded JQL searches."""
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime
+import queue
+import threading
+from typing import Iterator, List, Optional
+
+import jira
+
+from .helpers import add_jql_clause, split_order_by
+from .records import DEFAULT_SEARCH_FIELDS, PAGE_SIZE, IssueRecord, IssueSearch
+from .records import count_issues
+from .utils import get_client, get_thread_client
+
+CREATED_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
+JQL_DATE_FORMAT = "%Y/%m/%d %H:%M"
+SHARD_ORDER_BY = "ORDER BY created ASC, key ASC"
+MAX_SHARD_WORKERS = 8
+
+_DONE = object()
+_EXECUTOR: Optional[Executor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def shard_executor() -> Executor:
+    """
+    Return the thread pool shared by sharded searches.
+
+    The pool is created on first use and kept for the life of the process,
+    so its worker threads, and the client each one holds
+    (see ``get_thread_client``), are reused across searches.
+
+    """
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=MAX_SHARD_WORKERS, thread_name_prefix="shard"
+            )
+    return _EXECUTOR
+
+
+def _created_bound(
+    conditions: str, direction: str, client: jira.JIRA
+) -> Optional[datetime]:
+    page = client.search_issues(
+        "{} ORDER BY created {}".format(conditions, direction).strip(),
+        maxResults=1,
+        fields="created",
+        json_result=True,
+    )
+    if not page["issues"]:
+        return None
+    return datetime.strptime(page["issues"][0]["fields"]["created"], CREATED_FORMAT)
+
+
+def created_windows(
+    query: str, shards: int, client: Optional[jira.JIRA] = None
+) -> List[str]:
+    """
+    Split a JQL query into queries over disjoint ``created`` date windows.
+
+    The windows evenly divide the time between the first and last created
+    matching issues, and together cover every issue matching the query.
+    Each query is ordered by creation date (replacing any ``ORDER BY``
+    of the original query), so running them in order gives one ordered stream.
+
+    Args:
+        query: the JQL query to split
+        shards: the number of windows to split into
+        client: the instantiated JIRA client
+
+    Returns:
+        the window queries, oldest first; empty if nothing matches
+
+    """
+    client = client or get_client()
+    conditions, _ = split_order_by(query)
+    first = _created_bound(conditions, "ASC", client)
+    last = _created_bound(conditions, "DESC", client)
+    if first is None or last is None:
+        return []
+
+    step = (last - first) / max(shards, 1)
+    # Boundaries have minute resolution in JQL, so close ones may collapse.
+    boundaries = sorted(
+        {(first + step * i).strftime(JQL_DATE_FORMAT) for i in range(1, shards)}
+    )
+
+    windows = []
+    lower = None
+    for upper in boundaries + [None]:
+        bounds = []
+        if lower:
+            bounds.append('created >= "{}"'.format(lower))
+        if upper:
+            bounds.append('created < "{}"'.format(upper))
+        shard = (
+            add_jql_clause(conditions, " AND ".join(bounds)) if bounds else conditions
+        )
+        windows.append(" ".join(filter(None, (shard, SHARD_ORDER_BY))))
+        lower = upper
+    return windows
+
+
+class ShardedSearch:
+    """
+    A JQL search fetched as concurrent shards, yielding ``IssueRecord`` objects.
+
+    The query is split into ``created`` date windows (see ``created_windows``)
+    that are paged in concurrently, each worker thread with its own client.
+    Results are yielded as one stream ordered by creation date,
+    with any duplicate keys dropped.
+    Each shard buffers at most a few pages ahead of the consumer.
+
+    Shards run on ``shard_executor()`` unless given another executor;
+    searches iterated in turn share it,
+    but interleaving the iteration of two searches needs separate executors.
+
+    Args:
+        query: the JQL query; any ``ORDER BY`` is replaced by creation date
+        shards: the number of date windows to split the query into
+        max_results: the most issues to return, falsy for no limit
+        fields: comma-separated names of the fields to fetch
+        expand: comma-separated names of the extra data to expand
+        page_size: the number of issues to request per page
+        client: the instantiated JIRA client, for the count and the date windows
+        executor: the executor to fetch the shards on
+
+    """
+
+    def __init__(
+        self,
+        query: str,
+        shards: int,
+        max_results: Optional[int] = None,
+        fields: str = DEFAULT_SEARCH_FIELDS,
+        expand: Optional[str] = None,
+        page_size: int = PAGE_SIZE,
+        client: Optional[jira.JIRA] = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.query = query
+        self.shards = shards
+        self.max_results = max_results or None
+        self.fields = fields
+        self.expand = expand
+        self.page_size = page_size
+        self.client = client or get_client()
+        self.executor = executor
+        self._total: Optional[int] = None
+
+    @property
+    def total(self) -> int:
+        """Return the number of issues matching the query on the server."""
+        if self._total is None:
+            self._total = count_issues(
+                split_order_by(self.query)[0], client=self.client
+            )
+        return self._total
+
+    def __len__(self) -> int:
+        """Return the number of issues the search will yield."""
+        if self.max_results:
+            return min(self.total, self.max_results)
+        return self.total
+
+    def _fetch_shard(
+        self, shard_query: str, results: queue.Queue, stop: threading.Event
+    ) -> None:
+        def put(item: object) -> None:
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        if stop.is_set():
+            return
+        try:
+            search = IssueSearch(
+                shard_query,
+                max_results=self.max_results,
+                fields=self.fields,
+                expand=self.expand,
+                client=get_thread_client(),
+                page_size=self.page_size,
+            )
+            # Checking after each put stops before the next page is fetched.
+            for record in search:
+                put(record)
+                if stop.is_set():
+                    return
+        except Exception as e:
+            put(e)
+        put(_DONE)
+
+    def __iter__(self) -> Iterator[IssueRecord]:
+        """Fetch the shards concurrently, yielding their merged results."""
+        if self._total == 0:
+            return
+        shard_queries = created_windows(self.query, self.shards, client=self.client)
+        queues: List[queue.Queue] = [
+            queue.Queue(maxsize=2 * self.page_size) for _ in shard_queries
+        ]
+        stop = threading.Event()
+        executor = self.executor or shard_executor()
+        futures = []
+        try:
+            # Shards start in order, so the one being drained is always running.
+            for shard_query, results in zip(shard_queries, queues):
+                futures.append(
+                    executor.submit(self._fetch_shard, shard_query, results, stop)
+                )
+
+            seen = set()
+            for results in queues:
+                for record in iter(results.get, _DONE):
+                    if isinstance(record, Exception):
+                        raise record
+                    if record.key in seen:
+                        continue
+                    seen.add(record.key)
+                    yield record
+                    if self.max_results and len(seen) >= self.max_results:
+                        return
+        finally:
+            stop.set()
+            for future in futures:
+                future.cancel()
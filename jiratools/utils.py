@@ -2,12 +2,14 @@
 from configparser import ConfigParser, SectionProxy
 import os
 from pathlib import Path
+import threading
 
 import jira
 from jgt_common import error_if
 
 CONFIG_FILENAME = str(Path.home() / "jira.config")
 CONFIG = None
+_THREAD_CLIENTS = threading.local()
 
 SAMPLE_CONFIG_FILENAME = os.path.join(
     os.path.dirname(os.path.abspath(__file__)), "jira.config.example"
@@ -16,6 +18,12 @@ SAMPLE_CONFIG_FILENAME = os.path.join(
 REQUIRED_KEYS = ("JIRA_URL", "USERNAME", "PASSWORD", "DEFAULT_ASSIGNEE", "TEST_PROJECT")
 DEFAULT_LINK_TYPE = "relates to"
 
+MIRROR_FILENAME = str(Path.home() / "jira_mirror.sqlite")
+DEFAULT_MIRROR_MAX_AGE = 300
+DEFAULT_MIRROR_SCAN_INTERVAL = 3600
+
+JOURNAL_DIRNAME = str(Path.home() / "jira_make_linked")
+
 
 class ConfigNotFoundException(Exception):
     """Exception for config failure."""
@@ -40,6 +48,21 @@ def get_client() -> jira.JIRA:
     return client
 
 
+def get_thread_client() -> jira.JIRA:
+    """
+    Return a configured JIRA client for the current thread.
+
+    The client is created on first use and reused by later calls
+    from the same thread, so a pool of worker threads shares a pool of clients
+    without sharing a client between threads.
+
+    """
+    client = getattr(_THREAD_CLIENTS, "client", None)
+    if client is None:
+        client = _THREAD_CLIENTS.client = get_client()
+    return client
+
+
 def load_config() -> SectionProxy:
     """
     Load CONFIG_FILENAME into CONFIG.
@@ -0,0 +1,127 @@
+"""A stand-in JIRA client that answers the JQL the tools send from memory."""
+from datetime import datetime, timedelta
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from jiratools.helpers import split_order_by
+
+SERVER = "https://jira.example.com"
+CREATED_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
+CLAUSE_PATTERN = re.compile(r"^(\w+)\s*(=|>=|<|in)\s*(.+)$")
+LIST_PATTERN = re.compile(r'"([^"]*)"')
+
+
+def _strip_parens(text: str) -> str:
+    text = text.strip()
+    while text.startswith("(") and text.endswith(")"):
+        text = text[1:-1].strip()
+    return text
+
+
+class StubClient:
+    """
+    Hold issues in memory and answer searches for them.
+
+    Understands only the JQL the tools build: ``AND``-ed clauses of
+    ``field = "value"``, ``key in (...)``, ``updated >= "-Nm"``,
+    ``created >= / < "YYYY/MM/DD HH:MM"``, and ``ORDER BY`` on created or key.
+    """
+
+    def __init__(self) -> None:
+        self._fields: Dict[str, str] = {}
+        self.issues: Dict[str, Dict] = {}
+        self.updated: Dict[str, float] = {}
+        self.searches: List[Tuple[str, int]] = []
+
+    def client_info(self) -> str:
+        """Return the server URL."""
+        return SERVER
+
+    def add(self, key: str, created: Optional[datetime] = None, **fields) -> None:
+        """Add an issue, last updated a day ago."""
+        created = created or datetime(2020, 1, 1) + timedelta(days=len(self.issues))
+        fields.setdefault("summary", "Summary of {}".format(key))
+        fields["created"] = created.strftime(CREATED_FORMAT) + "+0000"
+        self.issues[key] = fields
+        self.updated[key] = time.time() - 86400
+
+    def touch(self, key: str, **fields) -> None:
+        """Update an issue's fields, marking it as just updated."""
+        self.issues[key].update(fields)
+        self.updated[key] = time.time()
+
+    def remove(self, key: str) -> None:
+        """Delete an issue."""
+        del self.issues[key]
+
+    def _matches(self, key: str, clause: str) -> bool:
+        match = CLAUSE_PATTERN.match(_strip_parens(clause))
+        assert match, "unsupported JQL clause: {}".format(clause)
+        name, operator, value = match.groups()
+        if name == "key":
+            return key in LIST_PATTERN.findall(value)
+        if name == "updated":
+            minutes = int(value.strip('"-m'))
+            return time.time() - self.updated[key] <= minutes * 60
+        if name == "created":
+            created = self._created(key)
+            bound = datetime.strptime(value.strip('"'), "%Y/%m/%d %H:%M")
+            return created >= bound if operator == ">=" else created < bound
+        return str(self.issues[key].get(name)) == value.strip('"')
+
+    def _created(self, key: str) -> datetime:
+        created = self.issues[key]["created"]
+        return datetime.strptime(created[:-5], CREATED_FORMAT[:-2])
+
+    def _search(self, jql: str) -> List[str]:
+        conditions, order_by = split_order_by(jql)
+        clauses = [x for x in _strip_parens(conditions).split(" AND ") if x]
+        keys = [
+            key
+            for key in self.issues
+            if all(self._matches(key, clause) for clause in clauses)
+        ]
+        terms = order_by.split(None, 2)[2].split(",") if order_by else []
+        for term in reversed(terms):
+            name, direction = term.split()
+            sort_key = self._created if name == "created" else str
+            keys.sort(key=sort_key, reverse=direction.upper() == "DESC")
+        return keys
+
+    def search_issues(
+        self,
+        jql_str: str,
+        startAt: int = 0,  # noqa: N803
+        maxResults: int = 50,  # noqa: N803
+        validate_query: bool = True,
+        fields: Optional[str] = None,
+        expand: Optional[str] = None,
+        json_result: bool = False,
+    ) -> Dict:
+        """Return one page of matching issues, as raw JSON."""
+        assert json_result, "only raw JSON searches are supported"
+        self.searches.append((jql_str, maxResults))
+        keys = self._search(jql_str)
+        names = (fields or "").split(",")
+        return {
+            "total": len(keys),
+            "issues": [
+                {
+                    "key": key,
+                    "fields": {
+                        name: value
+                        for name, value in self.issues[key].items()
+                        if name in names
+                    },
+                }
+                for key in keys[startAt : startAt + maxResults]
+            ],
+        }
+
+
+@pytest.fixture
+def client() -> StubClient:
+    return StubClient()
@@ -0,0 +1,170 @@
+import json
+import random
+
+import pytest
+
+from jiratools import error_logger
+from jiratools.error_logger import ANCHOR_LENGTH, JiraEntry, JiraEntryStore
+from jiratools.error_logger import update_jira_for_errors
+
+ENTRIES = [
+    JiraEntry("ABC-1", "Error code 000123 in module"),
+    JiraEntry("ABC-2", "timeout"),
+    JiraEntry("ABC-3", "Error code"),
+    JiraEntry("ABC-4", "Error code 000123 in module"),
+    JiraEntry("ABC-5", ""),
+    JiraEntry("ABC-6", "in module"),
+    JiraEntry("ABC-7", "x"),
+    JiraEntry("ABC-8", "Error code 000456 in module"),
+]
+ERRORS = [
+    "Error code 000123 in module foo",
+    "connection timeout after Error code 000456 in module",
+    "nothing to see",
+    "",
+    "xx timeout Error code 000123 in module timeout",
+]
+
+
+def list_matches(entries, *errors):
+    return [
+        (entry.jira_id, error)
+        for entry in entries
+        for error in errors
+        if entry.error_message and entry.error_message in error
+    ]
+
+
+def store_matches(entries, *errors):
+    return [(x.jira_id, y) for x, y in JiraEntryStore(entries).matches(*errors)]
+
+
+def test_matches_like_the_list_path():
+    assert store_matches(ENTRIES, *ERRORS) == list_matches(ENTRIES, *ERRORS)
+
+
+def test_matches_random_signatures_like_the_list_path():
+    rng = random.Random(0)
+    words = ["Error", "code", "in", "module", "failed", "0", "1", "timeout", " "]
+    entries = [
+        JiraEntry(
+            "ABC-{}".format(number),
+            "".join(rng.choice(words) for _ in range(rng.randrange(1, 6))),
+        )
+        for number in range(300)
+    ]
+    errors = [" ".join(rng.choice(words) for _ in range(60)) for _ in range(5)]
+
+    assert store_matches(entries, *errors) == list_matches(entries, *errors)
+
+
+def test_shared_starts_are_anchored_apart():
+    store = JiraEntryStore(
+        JiraEntry("ABC-{}".format(x), "Error code {:06d} in module".format(x))
+        for x in range(1000)
+    )
+
+    assert max(len(x) for x in store._by_anchor.values()) == 1
+    matched = store.matches("Error code 000999 in module; Error code 000007 in module")
+    assert [x.jira_id for x, _ in matched] == ["ABC-7", "ABC-999"]
+
+
+def test_messages_anchored_past_their_start_match_whole():
+    store = JiraEntryStore(
+        [JiraEntry("ABC-1", "Error code 1"), JiraEntry("ABC-2", "Error code 2")]
+    )
+    ((message, offset),) = store._by_anchor["rror cod"]
+    assert (message, offset) == ("Error code 2", 1)
+    assert len("rror cod") == ANCHOR_LENGTH
+
+    assert not store.matches("rror code 2")
+    assert [x.jira_id for x, _ in store.matches("xError code 2")] == ["ABC-2"]
+
+
+def test_update_jira_for_errors_uses_the_store(monkeypatch):
+    comments = []
+
+    def add_comment(jira_id, error, **format_kwargs):
+        comments.append((jira_id, error))
+        return jira_id
+
+    monkeypatch.setattr(error_logger, "add_jira_error_comment", add_comment)
+    from_list = update_jira_for_errors(ENTRIES, *ERRORS)
+    from_store = update_jira_for_errors(JiraEntryStore(ENTRIES), *ERRORS)
+
+    assert from_store == from_list
+    assert comments[: len(comments) // 2] == comments[len(comments) // 2 :]
+
+
+def test_store_is_a_collection_of_its_entries():
+    store = JiraEntryStore(ENTRIES)
+    assert len(store) == len(ENTRIES)
+    assert list(store) == ENTRIES
+
+
+@pytest.mark.parametrize(
+    "name, text",
+    [
+        (
+            "signatures.json",
+            json.dumps(
+                [
+                    {"jira_id": "ABC-1", "error_message": "boom"},
+                    {"jira_id": 2, "error_message": 404},
+                    {"jira_id": "ABC-3", "error_message": None},
+                ]
+            ),
+        ),
+        (
+            "signatures.csv",
+            "jira_id,error_message\nABC-1,boom\n2,404\nABC-3,\n",
+        ),
+    ],
+)
+def test_from_file(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+
+    store = JiraEntryStore.from_file(str(path))
+
+    assert [(x.jira_id, x.error_message) for x in store] == [
+        ("ABC-1", "boom"),
+        ("2", "404"),
+        ("ABC-3", ""),
+    ]
+    assert [x.jira_id for x, _ in store.matches("boom: HTTP 404")] == ["ABC-1", "2"]
+
+
+def test_from_yaml_file(tmp_path):
+    pytest.importorskip("yaml")
+    path = tmp_path / "signatures.yml"
+    path.write_text("- jira_id: ABC-1\n  error_message: 404\n")
+
+    (entry,) = JiraEntryStore.from_file(str(path))
+
+    assert (entry.jira_id, entry.error_message) == ("ABC-1", "404")
+
+
+@pytest.mark.parametrize(
+    "name, text, message",
+    [
+        ("signatures.txt", "", 'Unknown signature file type ".txt"'),
+        (
+            "signatures.json",
+            json.dumps([{"jira_id": "ABC-1", "error_message": "a"}, {"jira_id": 2}]),
+            "entry 2 is missing: error_message",
+        ),
+        (
+            "signatures.json",
+            json.dumps([{"jira_id": "", "error_message": "a"}]),
+            "entry 1 is missing: jira_id",
+        ),
+        ("signatures.json", json.dumps(["ABC-1"]), "missing: jira_id, error_message"),
+    ],
+)
+def test_from_file_errors(tmp_path, name, text, message):
+    path = tmp_path / name
+    path.write_text(text)
+
+    with pytest.raises(ValueError, match=message):
+        JiraEntryStore.from_file(str(path))
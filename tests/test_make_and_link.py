@@ -0,0 +1,180 @@
+from types import SimpleNamespace
+
+import jira
+import pytest
+from requests import ConnectionError
+
+from jiratools import make_and_link
+from jiratools.make_and_link import cli_make_linked, load_journal
+
+ARGS = {
+    "jira_id": "DEV-1",
+    "project": "TEST",
+    "summary": "Test {dev_jira_id}: {dev_jira_summary}",
+    "description": "Test it.",
+    "issue_type": "Story",
+    "user": "tester",
+    "assign": False,
+    "labels": ["qa"],
+    "components": [],
+    "watchers": ["alice", "bob"],
+}
+
+
+class LinkClient:
+    """Record the calls make-linked makes; ``failing_steps`` fail once."""
+
+    def __init__(self):
+        self.created = []
+        self.deleted = []
+        self.links = []
+        self.watchers = []
+        self.removed_labels = []
+        self.fail_create = None
+        self.failing_steps = set()
+
+    def _step(self, name):
+        if name in self.failing_steps:
+            self.failing_steps.remove(name)
+            raise ConnectionError("timed out")
+
+    def create_issue(self, **fields):
+        """Make an issue, or raise ``fail_create``."""
+        if self.fail_create:
+            raise self.fail_create
+        self.created.append(fields)
+        return self.issue("TEST-{}".format(len(self.created)))
+
+    def issue(self, key, fields=None):
+        """Return a handle on an issue."""
+        return SimpleNamespace(
+            key=key,
+            permalink=lambda: "https://jira.example.com/browse/{}".format(key),
+            delete=lambda: self.deleted.append(key),
+            update=lambda update: self.removed_labels.append((key, update)),
+        )
+
+    def search_issues(self, jql, maxResults=50, fields=None):  # noqa: N803
+        """Find the issues made with the label the JQL asks for."""
+        return [
+            self.issue("TEST-{}".format(number))
+            for number, issue in enumerate(self.created, 1)
+            if jql.split('"')[1] in issue.get("labels", [])
+        ][:maxResults]
+
+    def create_issue_link(self, relation_type, from_jira, to_jira):
+        """Link two issues."""
+        self._step("link")
+        self.links.append((from_jira, to_jira))
+
+    def add_watcher(self, key, watcher):
+        """Add a watcher to an issue."""
+        self._step(watcher)
+        self.watchers.append(watcher)
+
+
+@pytest.fixture
+def link_client(monkeypatch, tmp_path):
+    client = LinkClient()
+    dev_jira = SimpleNamespace(key="DEV-1", fields=SimpleNamespace(summary="Do it"))
+    monkeypatch.setattr(make_and_link, "get_client", lambda: client)
+    monkeypatch.setattr(make_and_link, "get_issue_by_id", lambda *a, **k: dev_jira)
+    monkeypatch.setattr(make_and_link, "journal_dirname", lambda: str(tmp_path))
+    return client
+
+
+def test_make_linked(link_client):
+    cli_make_linked(**ARGS)
+
+    (fields,) = link_client.created
+    assert fields["summary"] == "Test DEV-1: Do it"
+    assert fields["labels"] == ["qa"]
+    assert link_client.links == [("TEST-1", "DEV-1")]
+    assert sorted(link_client.watchers) == ["alice", "bob"]
+    assert link_client.removed_labels == []
+    assert load_journal("DEV-1") is None
+
+
+def test_rerun_resumes_failed_steps(link_client):
+    link_client.failing_steps.add("bob")
+    with pytest.raises(SystemExit):
+        cli_make_linked(**ARGS)
+    assert load_journal("DEV-1")["watchers"] == ["alice"]
+
+    cli_make_linked(**ARGS)
+    assert len(link_client.created) == 1
+    assert link_client.links == [("TEST-1", "DEV-1")]
+    assert sorted(link_client.watchers) == ["alice", "bob"]
+
+
+def test_rerun_with_other_options_is_refused(link_client):
+    link_client.fail_create = ConnectionError("timed out")
+    with pytest.raises(SystemExit):
+        cli_make_linked(**ARGS)
+
+    link_client.fail_create = None
+    with pytest.raises(SystemExit):
+        cli_make_linked(**dict(ARGS, project="OTHER"))
+    assert link_client.created == []
+
+
+def test_rejected_create_is_retried(link_client):
+    link_client.fail_create = jira.exceptions.JIRAError("no such field")
+    with pytest.raises(SystemExit):
+        cli_make_linked(**ARGS)
+
+    link_client.fail_create = None
+    cli_make_linked(**ARGS)
+    assert len(link_client.created) == 1
+
+
+def test_interrupted_untracked_create_is_not_repeated(link_client, capsys):
+    link_client.fail_create = ConnectionError("timed out")
+    with pytest.raises(SystemExit):
+        cli_make_linked(**ARGS)
+
+    link_client.fail_create = None
+    with pytest.raises(SystemExit):
+        cli_make_linked(**ARGS)
+    assert link_client.created == []
+    assert "may exist in project TEST" in capsys.readouterr().out
+
+    cli_make_linked(**ARGS, rollback=True)
+    assert load_journal("DEV-1") is None
+
+
+def test_interrupted_tracked_create_is_found(link_client, monkeypatch):
+    create_issue = link_client.create_issue
+
+    def create_then_time_out(**fields):
+        create_issue(**fields)
+        raise ConnectionError("timed out")
+
+    monkeypatch.setattr(link_client, "create_issue", create_then_time_out)
+    with pytest.raises(SystemExit):
+        cli_make_linked(**ARGS, track=True)
+
+    monkeypatch.setattr(link_client, "create_issue", create_issue)
+    cli_make_linked(**ARGS, track=True)
+    assert len(link_client.created) == 1
+    assert link_client.links == [("TEST-1", "DEV-1")]
+    ((key, update),) = link_client.removed_labels
+    assert key == "TEST-1"
+    assert update["labels"][0]["remove"].startswith("jiratools-make-linked-")
+
+
+def test_rollback_deletes_the_made_issue(link_client):
+    link_client.failing_steps.add("link")
+    with pytest.raises(SystemExit):
+        cli_make_linked(**ARGS)
+
+    cli_make_linked(**ARGS, rollback=True)
+    assert link_client.deleted == ["TEST-1"]
+    assert load_journal("DEV-1") is None
+
+
+def test_concurrent_run_is_refused(link_client):
+    with make_and_link._journal_lock("DEV-1"):
+        with pytest.raises(SystemExit):
+            cli_make_linked(**ARGS)
+    assert link_client.created == []
@@ -0,0 +1,110 @@
+import time
+
+import pytest
+
+from jiratools.mirror import KEY_PAGE_SIZE, count_mirrored, is_fresh, iter_mirrored
+from jiratools.mirror import open_mirror, sync_query
+
+QUERY = 'status = "Open" ORDER BY key ASC'
+
+
+@pytest.fixture
+def connection():
+    connection = open_mirror(":memory:")
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def synced(client, connection):
+    for number in range(1, 6):
+        client.add("ABC-{}".format(number), status="Open")
+    client.add("ABC-6", status="Closed")
+    sync_query(QUERY, connection=connection, client=client)
+    return client
+
+
+def mirrored(connection, query=QUERY):
+    return [
+        (x.key, x.fields["summary"])
+        for x in iter_mirrored(query, connection=connection)
+    ]
+
+
+def test_first_sync_downloads_all_matches_in_order(synced, connection):
+    assert mirrored(connection) == [
+        ("ABC-{}".format(x), "Summary of ABC-{}".format(x)) for x in range(1, 6)
+    ]
+    assert count_mirrored(QUERY, connection=connection) == 5
+
+
+def test_incremental_sync_downloads_only_updated_issues(synced, connection):
+    synced.touch("ABC-3", summary="Changed")
+    synced.searches.clear()
+
+    downloaded = sync_query(QUERY, connection=connection, client=synced, scan=False)
+
+    assert downloaded == 1
+    assert len(synced.searches) == 1
+    assert dict(mirrored(connection))["ABC-3"] == "Changed"
+    assert [x for x, _ in mirrored(connection)][2] == "ABC-3"
+
+
+def test_new_issues_go_last_until_scanned(synced, connection):
+    synced.add("ABC-0", status="Open")
+    synced.touch("ABC-0")
+
+    sync_query(QUERY, connection=connection, client=synced, scan=False)
+    assert [x for x, _ in mirrored(connection)][-1] == "ABC-0"
+
+    sync_query(QUERY, connection=connection, client=synced, scan=True)
+    assert [x for x, _ in mirrored(connection)][0] == "ABC-0"
+
+
+def test_scan_drops_departed_and_fetches_joined_issues(synced, connection):
+    # Neither change marks the issue as updated, so only a scan notices them.
+    synced.issues["ABC-2"]["status"] = "Closed"
+    synced.issues["ABC-6"]["status"] = "Open"
+    synced.remove("ABC-4")
+
+    sync_query(QUERY, connection=connection, client=synced, scan=False)
+    assert len(mirrored(connection)) == 5
+
+    downloaded = sync_query(QUERY, connection=connection, client=synced, scan=True)
+    assert downloaded == 1
+    assert [x for x, _ in mirrored(connection)] == ["ABC-1", "ABC-3", "ABC-5", "ABC-6"]
+
+
+def test_updated_issue_leaving_results_is_dropped_by_scan(synced, connection):
+    synced.touch("ABC-1", status="Closed")
+    sync_query(QUERY, connection=connection, client=synced, scan=True)
+    assert "ABC-1" not in dict(mirrored(connection))
+
+
+def test_scan_lists_keys_in_large_pages(synced, connection):
+    synced.searches.clear()
+    sync_query(QUERY, connection=connection, client=synced, scan=True)
+    # The updated issues, then a single page of keys for the scan.
+    assert synced.searches[1] == (QUERY, KEY_PAGE_SIZE)
+    assert len(synced.searches) == 2
+
+
+def test_changed_fields_resync_everything(synced, connection):
+    downloaded = sync_query(
+        QUERY, fields="summary,status", connection=connection, client=synced
+    )
+    assert downloaded == 5
+    assert is_fresh(QUERY, fields="status", max_age=60, connection=connection)
+
+
+def test_is_fresh(synced, connection):
+    assert is_fresh(QUERY, max_age=60, connection=connection)
+    assert not is_fresh(QUERY, fields="status", max_age=60, connection=connection)
+    assert not is_fresh("other query", max_age=60, connection=connection)
+    time.sleep(0.01)
+    assert not is_fresh(QUERY, max_age=0, connection=connection)
+
+
+def test_max_results(synced, connection):
+    keys = [x.key for x in iter_mirrored(QUERY, 2, connection=connection)]
+    assert keys == ["ABC-1", "ABC-2"]
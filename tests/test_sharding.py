@@ -0,0 +1,87 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from jiratools import sharding
+from jiratools.sharding import ShardedSearch, created_windows
+
+QUERY = 'status = "Open" ORDER BY key DESC'
+
+
+@pytest.fixture
+def issues(client, monkeypatch):
+    for number in range(1, 31):
+        client.add("ABC-{}".format(number), status="Open" if number % 3 else "Closed")
+    monkeypatch.setattr(sharding, "get_thread_client", lambda: client)
+    return client
+
+
+def open_keys(client):
+    return client._search('status = "Open" ORDER BY created ASC')
+
+
+@pytest.mark.parametrize("shards", [1, 2, 3, 7, 40])
+def test_windows_partition_the_matches(issues, shards):
+    windows = created_windows(QUERY, shards, client=issues)
+
+    assert 1 <= len(windows) <= shards
+    shard_keys = [issues._search(x) for x in windows]
+    merged = [key for keys in shard_keys for key in keys]
+    assert merged == open_keys(issues)
+    assert all("ORDER BY created ASC, key ASC" in x for x in windows)
+
+
+def test_no_windows_without_matches(client):
+    assert created_windows('status = "Open"', 4, client=client) == []
+
+
+@pytest.mark.parametrize("shards", [1, 4, sharding.MAX_SHARD_WORKERS + 4])
+def test_search_yields_every_match_in_created_order(issues, shards):
+    search = ShardedSearch(QUERY, shards, client=issues, page_size=2)
+
+    assert len(search) == 20
+    assert [x.key for x in search] == open_keys(issues)
+
+
+def test_search_drops_duplicates(issues, monkeypatch):
+    windows = created_windows(QUERY, 2, client=issues)
+    monkeypatch.setattr(
+        sharding, "created_windows", lambda *args, **kwargs: windows + windows
+    )
+
+    keys = [x.key for x in ShardedSearch(QUERY, 2, client=issues, page_size=3)]
+
+    assert keys == open_keys(issues)
+
+
+def test_search_stops_at_max_results(issues):
+    search = ShardedSearch(
+        QUERY, 4, max_results=5, client=issues, page_size=2, fields="summary,status"
+    )
+
+    records = list(search)
+
+    assert len(search) == 5
+    assert [x.key for x in records] == open_keys(issues)[:5]
+    assert records[0].fields == {"summary": "Summary of ABC-1", "status": "Open"}
+
+
+def test_search_raises_shard_errors(issues, monkeypatch):
+    search_issues = issues.search_issues
+
+    def fail_shards(jql_str, *args, **kwargs):
+        if sharding.SHARD_ORDER_BY in jql_str:
+            raise RuntimeError("shard failed")
+        return search_issues(jql_str, *args, **kwargs)
+
+    monkeypatch.setattr(issues, "search_issues", fail_shards)
+    search = ShardedSearch(QUERY, 3, client=issues, page_size=2)
+    with pytest.raises(RuntimeError, match="shard failed"):
+        list(search)
+
+
+def test_search_without_matches(client):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        search = ShardedSearch('status = "Open"', 3, client=client, executor=executor)
+        assert len(search) == 0
+        assert list(search) == []